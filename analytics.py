@@ -0,0 +1,366 @@
+# analytics.py
+"""
+Usage statistics for the bot, kept as incrementally maintained counters.
+
+The bot calls the `record_*` methods as users look words up, open phrases
+and answer quiz polls. Counters are held in memory and written to
+data/analytics.json by a background thread every `flush_interval` seconds,
+so neither dashboard summaries nor request handlers ever scan or rewrite
+files. Only vocabulary words get per-word counters, which keeps memory
+bounded by the size of words.json. Exports are generators that yield one
+NDJSON/CSV line at a time.
+
+Command line:
+    python analytics.py summary
+    python analytics.py users --format csv > users.csv
+    python analytics.py words|daily [--format ndjson|csv]
+    python analytics.py backfill        # seed counters from tracking.json, once,
+                                        # with the bot stopped
+"""
+import os
+import io
+import csv
+import json
+import sys
+import time
+import argparse
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ANALYTICS_FILE = os.path.join(BASE_DIR, "data", "analytics.json")
+TRACK_FILE = os.path.join(BASE_DIR, "tracking.json")
+WORDS_FILE = os.path.join(BASE_DIR, "data", "words.json")
+
+# Items bot.py writes into a user's history that are not word lookups
+_NON_WORD_HISTORY = ("quiz_sent",)
+
+USER_FIELDS = ["user_id", "lookups", "phrases", "quiz_answered", "quiz_correct",
+               "quiz_accuracy", "quiz_by_type", "first_seen", "last_active"]
+WORD_FIELDS = ["word", "lookups", "quiz_answered", "quiz_correct", "quiz_accuracy"]
+DAILY_FIELDS = ["date", "active_users"]
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def _accuracy(answered: int, correct: int) -> Optional[float]:
+    return round(correct / answered, 4) if answered else None
+
+
+# ---------------- Counter store ----------------
+class AnalyticsStore:
+    """
+    In-memory counters with periodic write-behind to a JSON file.
+
+    Layout of the persisted file:
+      totals:     {"lookups", "phrases", "quiz_answered", "quiz_correct"}
+      quiz_types: {type: [answered, correct]}
+      users:      {user_id: {"lookups", "phrases", "quiz": {type: [answered, correct]},
+                             "first_seen", "last_active"}}
+      words:      {word: {"lookups", "quiz": [answered, correct]}}
+      daily:      {date: active_user_count}
+      today:      {"date", "users": [...]}   # users already counted for today
+      backfilled: true once backfill_from_tracking() has been applied
+    """
+
+    def __init__(self, path: str = ANALYTICS_FILE, flush_interval: float = 30.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._thread: Optional[threading.Thread] = None
+        self.backfilled = False
+        self.totals: Dict[str, int] = {"lookups": 0, "phrases": 0, "quiz_answered": 0, "quiz_correct": 0}
+        self.quiz_types: Dict[str, List[int]] = {}
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.words: Dict[str, Dict[str, Any]] = {}
+        self.daily: Dict[str, int] = {}
+        self._today_date = _today()
+        self._today_users: set = set()
+        self._load()
+
+    # ----- persistence -----
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.totals.update(data.get("totals", {}))
+                self.quiz_types = data.get("quiz_types", {})
+                self.users = data.get("users", {})
+                self.words = data.get("words", {})
+                self.daily = data.get("daily", {})
+                self.backfilled = bool(data.get("backfilled", False))
+                today = data.get("today", {})
+                if today.get("date") == self._today_date:
+                    self._today_users = set(today.get("users", []))
+        except Exception as e:
+            print(f"[ERROR] Failed to load analytics {self.path}: {e}")
+
+    def flush(self):
+        """Write counters to disk if they changed since the last flush."""
+        with self._lock:
+            if not self._dirty:
+                return
+            # serialize under the lock, write to disk outside it
+            payload = json.dumps({
+                "totals": self.totals,
+                "quiz_types": self.quiz_types,
+                "users": self.users,
+                "words": self.words,
+                "daily": self.daily,
+                "today": {"date": self._today_date, "users": sorted(self._today_users)},
+                "backfilled": self.backfilled,
+            }, ensure_ascii=False)
+            self._dirty = False
+        tmp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"[ERROR] Failed to save analytics {self.path}: {e}")
+            with self._lock:
+                self._dirty = True
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="analytics-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    # ----- recording -----
+    def _touch_user(self, user_id: Any, day: Optional[str] = None) -> Dict[str, Any]:
+        sid = str(user_id)
+        day = day or _today()
+        user = self.users.get(sid)
+        if user is None:
+            user = self.users[sid] = {"lookups": 0, "phrases": 0, "quiz": {}, "first_seen": day, "last_active": day}
+        user["last_active"] = day
+        if day != self._today_date:
+            self._today_date = day
+            self._today_users = set()
+        if sid not in self._today_users:
+            self._today_users.add(sid)
+            self.daily[day] = self.daily.get(day, 0) + 1
+        return user
+
+    def _changed(self):
+        # callers hold self._lock; the flush thread picks the change up
+        self._dirty = True
+        self._ensure_thread()
+
+    def record_lookup(self, user_id: Any, word: Optional[str] = None):
+        """Count a lookup; pass `word` only for vocabulary words so `words` stays bounded."""
+        word = (word or "").strip().lower()
+        with self._lock:
+            user = self._touch_user(user_id)
+            user["lookups"] += 1
+            self.totals["lookups"] += 1
+            if word:
+                entry = self.words.setdefault(word, {"lookups": 0, "quiz": [0, 0]})
+                entry["lookups"] += 1
+            self._changed()
+
+    def record_phrase(self, user_id: Any, topic: str):
+        with self._lock:
+            user = self._touch_user(user_id)
+            user["phrases"] += 1
+            self.totals["phrases"] += 1
+            self._changed()
+
+    def record_quiz_answer(self, user_id: Any, qtype: str, correct: bool, subject: Optional[str] = None):
+        qtype = qtype or "unknown"
+        hit = 1 if correct else 0
+        with self._lock:
+            user = self._touch_user(user_id)
+            per_user = user["quiz"].setdefault(qtype, [0, 0])
+            per_user[0] += 1
+            per_user[1] += hit
+            per_type = self.quiz_types.setdefault(qtype, [0, 0])
+            per_type[0] += 1
+            per_type[1] += hit
+            self.totals["quiz_answered"] += 1
+            self.totals["quiz_correct"] += hit
+            if subject:
+                entry = self.words.setdefault(subject.strip().lower(), {"lookups": 0, "quiz": [0, 0]})
+                entry["quiz"][0] += 1
+                entry["quiz"][1] += hit
+            self._changed()
+
+    # ----- reading -----
+    def summary(self) -> Dict[str, Any]:
+        """Dashboard numbers, read straight from the counters."""
+        with self._lock:
+            return {
+                "users": len(self.users),
+                "words_tracked": len(self.words),
+                "active_today": len(self._today_users) if self._today_date == _today() else 0,
+                "totals": dict(self.totals),
+                "quiz_accuracy": _accuracy(self.totals["quiz_answered"], self.totals["quiz_correct"]),
+                "quiz_by_type": {t: {"answered": a, "correct": c, "accuracy": _accuracy(a, c)}
+                                 for t, (a, c) in self.quiz_types.items()},
+                "daily_active_users": dict(sorted(self.daily.items())[-14:]),
+            }
+
+    def iter_users(self) -> Iterator[Dict[str, Any]]:
+        # list(keys) is the only copy made; each row is built as it is consumed
+        for sid in list(self.users.keys()):
+            with self._lock:
+                user = self.users.get(sid)
+                if user is None:
+                    continue
+                quiz = {t: list(v) for t, v in user.get("quiz", {}).items()}
+                row = dict(user)
+            answered = sum(v[0] for v in quiz.values())
+            correct = sum(v[1] for v in quiz.values())
+            yield {
+                "user_id": sid,
+                "lookups": row.get("lookups", 0),
+                "phrases": row.get("phrases", 0),
+                "quiz_answered": answered,
+                "quiz_correct": correct,
+                "quiz_accuracy": _accuracy(answered, correct),
+                "quiz_by_type": {t: _accuracy(a, c) for t, (a, c) in quiz.items()},
+                "first_seen": row.get("first_seen", ""),
+                "last_active": row.get("last_active", ""),
+            }
+
+    def iter_words(self) -> Iterator[Dict[str, Any]]:
+        for word in list(self.words.keys()):
+            with self._lock:
+                entry = self.words.get(word)
+                if entry is None:
+                    continue
+                lookups = entry.get("lookups", 0)
+                answered, correct = entry.get("quiz", [0, 0])
+            yield {
+                "word": word,
+                "lookups": lookups,
+                "quiz_answered": answered,
+                "quiz_correct": correct,
+                "quiz_accuracy": _accuracy(answered, correct),
+            }
+
+    def iter_daily(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            days = sorted(self.daily.items())
+        for day, count in days:
+            yield {"date": day, "active_users": count}
+
+    # ----- backfill -----
+    def backfill_from_tracking(self, track_file: str = TRACK_FILE, known_words: Optional[set] = None) -> int:
+        """
+        Seed lookup/phrase counters from the history lists in tracking.json.
+        Only items in `known_words` get per-word counters. Runs once per
+        counters file and must run while the bot is stopped, otherwise the
+        server's next flush overwrites the result. Returns the number of
+        users seen; raises RuntimeError if already applied.
+        """
+        if self.backfilled:
+            raise RuntimeError(f"backfill was already applied to {self.path}")
+        try:
+            with open(track_file, "r", encoding="utf-8") as f:
+                users = json.load(f).get("users", {})
+        except Exception as e:
+            print(f"[ERROR] Failed to read {track_file}: {e}")
+            return 0
+        with self._lock:
+            for sid, info in users.items():
+                user = self.users.setdefault(str(sid), {"lookups": 0, "phrases": 0, "quiz": {},
+                                                        "first_seen": "", "last_active": ""})
+                for item in info.get("history", []):
+                    if not isinstance(item, str) or item in _NON_WORD_HISTORY:
+                        continue
+                    if item.startswith("phrase:"):
+                        user["phrases"] += 1
+                        self.totals["phrases"] += 1
+                        continue
+                    user["lookups"] += 1
+                    self.totals["lookups"] += 1
+                    word = item.strip().lower()
+                    if known_words is not None and word in known_words:
+                        entry = self.words.setdefault(word, {"lookups": 0, "quiz": [0, 0]})
+                        entry["lookups"] += 1
+            self.backfilled = True
+            self._dirty = True
+        self.flush()
+        return len(users)
+
+
+# ---------------- Streaming formats ----------------
+def to_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def to_csv(rows: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        row = {k: (json.dumps(v, ensure_ascii=False) if isinstance(v, dict) else v) for k, v in row.items()}
+        writer.writerow(row)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+EXPORTS = {
+    "users": (AnalyticsStore.iter_users, USER_FIELDS),
+    "words": (AnalyticsStore.iter_words, WORD_FIELDS),
+    "daily": (AnalyticsStore.iter_daily, DAILY_FIELDS),
+}
+
+
+def export(store: AnalyticsStore, kind: str, fmt: str = "ndjson") -> Iterator[str]:
+    """Line generator for one of EXPORTS in 'ndjson' or 'csv' format."""
+    rows_fn, fields = EXPORTS[kind]
+    rows = rows_fn(store)
+    return to_csv(rows, fields) if fmt == "csv" else to_ndjson(rows)
+
+
+# ---------------- CLI ----------------
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Export bot usage statistics.")
+    parser.add_argument("command", choices=["summary", "backfill"] + list(EXPORTS))
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--file", default=ANALYTICS_FILE, help="analytics counters file")
+    parser.add_argument("--tracking", default=TRACK_FILE, help="tracking.json for backfill")
+    parser.add_argument("--words", default=WORDS_FILE, help="words.json for backfill")
+    args = parser.parse_args(argv)
+
+    store = AnalyticsStore(args.file)
+    if args.command == "summary":
+        print(json.dumps(store.summary(), ensure_ascii=False, indent=2))
+    elif args.command == "backfill":
+        # stop the bot first: its in-memory counters would overwrite the backfill
+        try:
+            with open(args.words, "r", encoding="utf-8") as f:
+                known_words = {w.lower() for w in json.load(f)}
+        except Exception as e:
+            print(f"[ERROR] Failed to read {args.words}: {e}")
+            sys.exit(1)
+        try:
+            count = store.backfill_from_tracking(args.tracking, known_words)
+        except RuntimeError as e:
+            print(f"Refusing to backfill: {e}")
+            sys.exit(1)
+        print(f"Backfilled counters from {count} users.")
+    else:
+        for line in export(store, args.command, args.format):
+            sys.stdout.write(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,30 @@
 # bot.py
 import os
+import hmac
 import json
+import atexit
 import random
+import threading
 from datetime import datetime
 from typing import Any, Optional, Dict, List
-from flask import Flask, request, abort, jsonify
+from flask import Flask, Response, request, abort, jsonify
 from telebot import TeleBot, types
 from telebot.types import BotCommand
 from deep_translator import GoogleTranslator
 from dotenv import load_dotenv
-import requests
+from phrase_catalog import PhraseCatalog, TOPIC_CALLBACK_PREFIX, PAGE_CALLBACK_PREFIX
+from word_search import WordIndex
+from analytics import AnalyticsStore, EXPORTS, export as export_stats
+from profiling import RequestProfiler
+from vocab_sync import VocabularySync
+from quiz_sessions import QuizSessionStore
 
 # ---------------- Environment ----------------
 load_dotenv()
 TOKEN = os.getenv("TOKEN")
 PUBLIC_URL_PATH = "/etc/secrets/PUBLIC_URL"
 QUIZ_SECRET = os.getenv("QUIZ_SECRET", "")  # secret for /trigger_quiz
+ADMIN_SECRET = os.getenv("ADMIN_SECRET", "")  # secret for /admin/* endpoints
 
 if os.path.exists(PUBLIC_URL_PATH):
     with open(PUBLIC_URL_PATH, "r") as f:
@@ -39,6 +48,15 @@ os.makedirs(DATA_DIR, exist_ok=True)
 WORDS_FILE = os.path.join(DATA_DIR, "words.json")
 PHRASES_FILE = os.path.join(DATA_DIR, "phrases.json")
 TRACK_FILE = os.path.join(BASE_DIR, "tracking.json")
+QUIZ_JOURNAL_FILE = os.path.join(DATA_DIR, "quiz_sessions.journal")
+ANALYTICS_FILE = os.path.join(DATA_DIR, "analytics.json")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(DATA_DIR, "profiles"))
+ROOT_WORDS_FILE = os.path.join(BASE_DIR, "words.json")
+VOCAB_SOURCE_URL = os.getenv("VOCAB_SOURCE_URL", "https://raw.githubusercontent.com/abutolibrashidov/Vocabulary-bot/main/words.json")
+VOCAB_DELTA_URL = os.getenv("VOCAB_DELTA_URL", "")  # optional endpoint serving vocab_sync deltas
+VOCAB_SYNC_INTERVAL = float(os.getenv("VOCAB_SYNC_INTERVAL", "600"))  # seconds; 0 disables background sync
+PHRASE_TOPICS_PER_PAGE = int(os.getenv("PHRASE_TOPICS_PER_PAGE", "8"))
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "300"))  # seconds Telegram may cache inline answers
 
 # ---------------- Helpers ----------------
 def load_json(file_path: str) -> Any:
@@ -57,6 +75,27 @@ def save_json(file_path: str, data: Any):
     except Exception as e:
         print(f"[ERROR] Failed to save JSON {file_path}: {e}")
 
+# Phrase topics are kept in memory and reloaded only when phrases.json changes
+phrase_catalog = PhraseCatalog(PHRASES_FILE, page_size=PHRASE_TOPICS_PER_PAGE)
+
+# Usage counters for admin stats; flushed in the background of normal requests
+analytics = AnalyticsStore(ANALYTICS_FILE)
+atexit.register(analytics.flush)
+
+# Handler profiling; off unless PROFILE_SAMPLE_RATE or PROFILE_SLOW_MS is set,
+# and adjustable at runtime through POST /admin/profiling
+profiler = RequestProfiler(
+    PROFILE_DIR,
+    sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    slow_ms=float(os.getenv("PROFILE_SLOW_MS", "0")),
+    interval_ms=float(os.getenv("PROFILE_INTERVAL_MS", "5")),
+    max_files=int(os.getenv("PROFILE_MAX_FILES", "50"))
+)
+
+# Running quizzes; replayed from the journal on startup
+quiz_sessions = QuizSessionStore(QUIZ_JOURNAL_FILE)
+atexit.register(quiz_sessions.flush)
+
 # Ensure tracking file structure
 def load_tracking() -> Dict:
     data = load_json(TRACK_FILE)
@@ -64,10 +103,7 @@ def load_tracking() -> Dict:
         data = {}
     if "users" not in data:
         data["users"] = {}
-    # global mapping of active polls to user
-    if "active_polls" not in data:
-        data["active_polls"] = {}
-    save_json(TRACK_FILE, data)
+        save_json(TRACK_FILE, data)
     return data
 
 # ---------------- User Tracking ----------------
@@ -82,8 +118,7 @@ def ensure_user_record(user_id: int, username: str = "", first_name: str = ""):
             "usage_count": 0,
             "history": [],
             "last_quiz_date": "",
-            "daily_quiz_count": 0,
-            "current_quiz": None  # {"questions": [...], "index": 0}
+            "daily_quiz_count": 0
         }
         data["users"] = users
         save_json(TRACK_FILE, data)
@@ -130,24 +165,22 @@ def translate_dynamic(text: str):
         return None, ("uz" if is_uz else "auto"), ("en" if is_uz else "uz")
 
 # ---------------- Word lookup ----------------
+# data/words.json is loaded once; when the server runs, updates are fetched in
+# the background and mirrored to the root words.json, so lookups never wait
+# on the network
+vocabulary = VocabularySync(
+    VOCAB_SOURCE_URL,
+    WORDS_FILE,
+    mirror_paths=[ROOT_WORDS_FILE],
+    delta_url=VOCAB_DELTA_URL,
+    interval=VOCAB_SYNC_INTERVAL
+)
+
 def load_words():
-    words = load_json(WORDS_FILE)
-    if not words:
-        url = "https://raw.githubusercontent.com/abutolibrashidov/Vocabulary-bot/main/words.json"
-        try:
-            r = requests.get(url, timeout=8)
-            if r.status_code == 200:
-                words = r.json()
-        except Exception as e:
-            print("Failed to load words from GitHub:", e)
-    return words if isinstance(words, dict) else {}
+    return vocabulary.words
 
 def find_word_info(word: str) -> Optional[dict]:
-    words = load_words()
-    for key, value in words.items():
-        if key.lower() == word.lower():
-            return value
-    return None
+    return vocabulary.lookup(word)
 
 def format_word_response(word: str, translation: str, info: Optional[dict] = None) -> str:
     response = f"📝 Word: *{word}*\n🔤 Translation: *{translation}*\n"
@@ -170,6 +203,23 @@ def format_word_response(word: str, translation: str, info: Optional[dict] = Non
             response += f"💡 Synonyms: {', '.join(info['synonyms'])}\n"
     return response.strip()
 
+# ---------------- Inline search index ----------------
+def _inline_result(entry_id: int, word: str, info: dict) -> types.InlineQueryResultArticle:
+    # Built once per word when the index is rebuilt, not per inline query
+    translation = info.get("translation", word)
+    return types.InlineQueryResultArticle(
+        id=str(entry_id),
+        title=word,
+        description=translation,
+        input_message_content=types.InputTextMessageContent(
+            format_word_response(word, translation, info), parse_mode="Markdown"
+        )
+    )
+
+word_index = WordIndex(render=_inline_result)
+word_index.rebuild(vocabulary.words)
+vocabulary.on_update = word_index.rebuild
+
 # ---------------- Bot Setup ----------------
 bot = TeleBot(TOKEN, parse_mode="Markdown")
 
@@ -188,6 +238,7 @@ def get_main_menu():
 
 # ---------------- Commands ----------------
 @bot.message_handler(commands=["start"])
+@profiler.profiled("cmd_start")
 def cmd_start(message: types.Message):
     track_user(message.from_user.id, message.from_user.username or "", message.from_user.first_name or "")
     bot.send_message(
@@ -197,12 +248,15 @@ def cmd_start(message: types.Message):
     )
 
 @bot.message_handler(commands=["quiz"])
+@profiler.profiled("cmd_quiz")
 def cmd_quiz(message: types.Message):
     user_id = message.from_user.id
     send_quiz_to_user(user_id)
 
 # ---------------- Message Handling ----------------
+# main_handler only routes: the handler it calls takes over the profiling tag
 @bot.message_handler(func=lambda msg: True)
+@profiler.profiled("main_handler", dispatch=True)
 def main_handler(message: types.Message):
     text = (message.text or "").strip()
     user_id = getattr(message.from_user, "id", None)
@@ -212,20 +266,22 @@ def main_handler(message: types.Message):
         msg = bot.send_message(message.chat.id, "Please enter the word to translate (English or Uzbek):")
         bot.register_next_step_handler(msg, translate_word)
     elif text == "🗣 Learn a Phrase":
-        phrases = load_json(PHRASES_FILE)
-        if not phrases:
-            bot.send_message(message.chat.id, "No phrase topics found.")
-            return
-        markup = types.InlineKeyboardMarkup()
-        for key in phrases.keys():
-            markup.add(types.InlineKeyboardButton(key, callback_data=f"phrase:{key}"))
-        bot.send_message(message.chat.id, "Select a phrase topic:", reply_markup=markup)
+        show_phrase_topics(message)
     elif text == "🎯 Take a Quiz":
         if user_id:
             send_quiz_to_user(user_id)
     else:
         translate_word(message)
 
+@profiler.profiled("show_phrase_topics")
+def show_phrase_topics(message: types.Message):
+    if not phrase_catalog:
+        bot.send_message(message.chat.id, "No phrase topics found.")
+        return
+    # keyboard_page() is already-serialized JSON; telebot sends it as-is
+    bot.send_message(message.chat.id, "Select a phrase topic:", reply_markup=phrase_catalog.keyboard_page(0))
+
+@profiler.profiled("translate_word")
 def translate_word(message: types.Message):
     word = (message.text or "").strip()
     info = find_word_info(word)
@@ -239,25 +295,57 @@ def translate_word(message: types.Message):
         response = f"📝 Word: *{word}*\n🔤 Translation: *{translation}*"
 
     increment_usage_count(message.from_user.id, word)
+    # only vocabulary words get per-word counters; free text is just a lookup
+    analytics.record_lookup(message.from_user.id, word if info else None)
     bot.send_message(message.chat.id, response, reply_markup=get_main_menu())
 
     # Check automatic quiz
     send_quiz_if_allowed(message.from_user.id)
 
+# ---------------- Inline Mode ----------------
+@bot.inline_handler(func=lambda query: True)
+@profiler.profiled("inline_word_search")
+def inline_word_search(query: types.InlineQuery):
+    # Runs at keystroke rate: answered purely from the in-memory index
+    results = word_index.search(query.query or "")
+    try:
+        bot.answer_inline_query(query.id, results, cache_time=INLINE_CACHE_TIME)
+    except Exception as e:
+        print("Failed to answer inline query:", e)
+
 # ---------------- Phrase Learning ----------------
-@bot.callback_query_handler(func=lambda call: call.data.startswith("phrase:"))
+@bot.callback_query_handler(func=lambda call: call.data.startswith(TOPIC_CALLBACK_PREFIX))
+@profiler.profiled("phrase_callback")
 def phrase_callback(call: types.CallbackQuery):
-    topic = call.data.split(":", 1)[1]
-    phrases = load_json(PHRASES_FILE)
-    if topic in phrases:
-        phrase = random.choice(phrases[topic])
+    topic = phrase_catalog.resolve_topic(call.data[len(TOPIC_CALLBACK_PREFIX):])
+    phrase = phrase_catalog.random_phrase_text(topic) if topic else None
+    if phrase:
         bot.answer_callback_query(call.id)
         bot.send_message(call.message.chat.id, f"🗣 Phrase from *{topic}*:\n\n👉 {phrase}")
         increment_usage_count(call.from_user.id, f"phrase:{topic}")
+        analytics.record_phrase(call.from_user.id, topic)
         send_quiz_if_allowed(call.from_user.id)
     else:
         bot.answer_callback_query(call.id, "Topic not found.")
 
+@bot.callback_query_handler(func=lambda call: call.data.startswith(PAGE_CALLBACK_PREFIX))
+@profiler.profiled("phrase_page_callback")
+def phrase_page_callback(call: types.CallbackQuery):
+    try:
+        page = int(call.data[len(PAGE_CALLBACK_PREFIX):])
+    except ValueError:
+        bot.answer_callback_query(call.id)
+        return
+    bot.answer_callback_query(call.id)
+    try:
+        bot.edit_message_reply_markup(
+            call.message.chat.id,
+            call.message.message_id,
+            reply_markup=phrase_catalog.keyboard_page(page)
+        )
+    except Exception as e:
+        print("Failed to switch phrase page:", e)
+
 # ---------------- Quiz System (POLL-based) ----------------
 def send_quiz_if_allowed(user_id: int):
     ensure_user_record(user_id)
@@ -287,7 +375,6 @@ def build_quiz_questions() -> List[Dict]:
     """
     questions = []
     words = load_words()
-    phrases = load_json(PHRASES_FILE)
 
     # Word translation question
     if words:
@@ -301,6 +388,7 @@ def build_quiz_questions() -> List[Dict]:
         random.shuffle(options)
         questions.append({
             "type": "word_translation",
+            "subject": word,
             "prompt": f"Translate this word: *{word}*",
             "options": options,
             "correct_index": options.index(correct) if correct in options else 0
@@ -315,19 +403,17 @@ def build_quiz_questions() -> List[Dict]:
         random.shuffle(options)
         questions.append({
             "type": "word_pos",
+            "subject": word,
             "prompt": f"What is the part of speech of *{word}*?",
             "options": options,
             "correct_index": options.index(correct) if correct in options else 0
         })
 
-    # Phrase recognition question
-    if phrases:
-        topic = random.choice(list(phrases.keys()))
-        phrase = random.choice(phrases[topic])
-        # build distractors from other phrases
-        all_phrases = [p for plist in phrases.values() for p in plist if p != phrase]
-        options = [phrase] + (random.sample(all_phrases, min(3, len(all_phrases))) if all_phrases else [])
-        options = list(dict.fromkeys(options))[:4]
+    # Phrase recognition question (sampled from the catalog; distractors from other topics)
+    picked = phrase_catalog.quiz_phrase(3)
+    if picked:
+        topic, phrase, distractors = picked
+        options = [phrase] + distractors
         while len(options) < 4:
             options.append("—")
         random.shuffle(options)
@@ -340,17 +426,16 @@ def build_quiz_questions() -> List[Dict]:
 
     return questions
 
+@profiler.profiled("send_quiz_to_user")
 def send_quiz_to_user(user_id: int):
     """
     Create a quiz (list of poll questions) and send the first poll.
-    We store the quiz in tracking.json under user's 'current_quiz'.
-    We also store active poll mapping data['active_polls'][poll_id] = sid
+    The quiz lives in quiz_sessions (in memory, journaled to disk);
+    the session is also indexed by the id of its active poll.
     """
     ensure_user_record(user_id)
-    data = load_tracking()
     words = load_words()
-    phrases = load_json(PHRASES_FILE)
-    if not words and not phrases:
+    if not words and not phrase_catalog:
         bot.send_message(user_id, "No words or phrases available for quiz.")
         return
 
@@ -359,39 +444,27 @@ def send_quiz_to_user(user_id: int):
         bot.send_message(user_id, "Could not build a quiz right now. Try later.")
         return
 
-    sid = str(user_id)
-    data["users"].setdefault(sid, data["users"].get(sid, {}))
-    data["users"][sid]["current_quiz"] = {"questions": questions, "index": 0, "results": []}
-    save_json(TRACK_FILE, data)
+    quiz_sessions.start(user_id, questions)
 
     increment_usage_count(user_id, "quiz_sent")
     # send first question
     _send_quiz_poll(user_id)
 
 def _send_quiz_poll(user_id: int):
-    data = load_tracking()
-    sid = str(user_id)
-    user_data = data["users"].get(sid, {})
-    quiz = user_data.get("current_quiz")
-    if not quiz:
+    session = quiz_sessions.get(user_id)
+    if not session:
         bot.send_message(user_id, "No quiz found. Start a new quiz with 🎯 Take a Quiz.")
         return
 
-    idx = quiz.get("index", 0)
-    questions = quiz.get("questions", [])
-    if idx >= len(questions):
-        # finished
+    if session.finished:
         bot.send_message(user_id, "✅ Quiz finished! Great job!", reply_markup=get_main_menu())
         # optionally summarize
-        results = quiz.get("results", [])
-        correct = sum(1 for r in results if r.get("correct"))
-        bot.send_message(user_id, f"You answered {correct}/{len(results)} correctly.")
+        bot.send_message(user_id, f"You answered {session.correct_count}/{len(session.results)} correctly.")
         # cleanup
-        data["users"][sid].pop("current_quiz", None)
-        save_json(TRACK_FILE, data)
+        quiz_sessions.finish(user_id)
         return
 
-    q = questions[idx]
+    q = session.current_question
     question_text = q["prompt"]
     options = q["options"]
     correct_index = q["correct_index"]
@@ -405,61 +478,53 @@ def _send_quiz_poll(user_id: int):
             correct_option_id=correct_index,
             is_anonymous=False
         )
-        # store active poll mapping so poll_answer can be resolved to user and quiz
-        poll_id = msg.poll.id
-        data = load_tracking()
-        data["active_polls"][poll_id] = {"user": sid}
-        save_json(TRACK_FILE, data)
+        # index the session by poll id so poll_answer can be resolved to user and quiz
+        quiz_sessions.attach_poll(session, msg.poll.id)
     except Exception as e:
         print("Failed to send poll:", e)
         bot.send_message(user_id, "Failed to send quiz poll. Try again later.")
 
 # ---------------- Poll Answer Handler ----------------
 @bot.poll_answer_handler(func=lambda x: True)
+@profiler.profiled("handle_poll_answer")
 def handle_poll_answer(poll_answer: types.PollAnswer):
     """
-    Called when a user answers an existing poll. We look up which user
-    this poll belongs to from tracking.json, evaluate, give feedback,
-    and advance the quiz.
+    Called when a user answers an existing poll. We look up the quiz
+    session this poll belongs to, evaluate, give feedback, and advance
+    the quiz.
     """
     poll_id = poll_answer.poll_id
     user_id = getattr(poll_answer.user, "id", None)
     if not user_id:
         return
 
-    data = load_tracking()
-    mapping = data.get("active_polls", {}).get(poll_id)
-    if not mapping:
-        # we don't have this poll in mapping (maybe old or not from us)
+    session = quiz_sessions.for_poll(poll_id)
+    if not session:
+        # we don't have this poll (maybe old or not from us)
         return
 
-    sid = mapping.get("user")
-    if sid != str(user_id):
+    if session.user_id != str(user_id):
         # poll belongs to someone else (ignore)
         return
 
-    # get user's quiz state
-    user_data = data["users"].get(sid, {})
-    quiz = user_data.get("current_quiz")
-    if not quiz:
-        return
-
-    qidx = quiz.get("index", 0)
-    questions = quiz.get("questions", [])
-    if qidx >= len(questions):
+    q = session.current_question
+    if not q:
         return
 
-    q = questions[qidx]
     chosen = poll_answer.option_ids[0] if poll_answer.option_ids else None
     correct = (chosen == q.get("correct_index"))
-    # save result
-    quiz.setdefault("results", []).append({
+    # save result and advance; the poll is dropped from the poll index
+    recorded = quiz_sessions.answer(session, poll_id, {
         "type": q.get("type"),
         "prompt": q.get("prompt"),
         "chosen_index": chosen,
         "correct_index": q.get("correct_index"),
         "correct": correct
     })
+    if not recorded:
+        # a new quiz replaced this one while we were evaluating the answer
+        return
+    analytics.record_quiz_answer(user_id, q.get("type"), correct, q.get("subject"))
 
     # feedback to user
     if correct:
@@ -469,15 +534,8 @@ def handle_poll_answer(poll_answer: types.PollAnswer):
         correct_text = q["options"][corr_idx] if corr_idx is not None and corr_idx < len(q["options"]) else "N/A"
         bot.send_message(user_id, f"❌ Wrong — correct answer: *{correct_text}*")
 
-    # advance
-    quiz["index"] = qidx + 1
-    data["users"][sid] = user_data
-    # remove this poll from active mapping
-    data["active_polls"].pop(poll_id, None)
-    save_json(TRACK_FILE, data)
-
     # send next poll
-    _send_quiz_poll(int(sid))
+    _send_quiz_poll(user_id)
 
 # ---------------- Flask Webhook & Trigger ----------------
 app = Flask(__name__)
@@ -500,7 +558,24 @@ def telegram_webhook():
     return "", 200
 
 # Endpoint for external scheduler (GitHub Actions) to trigger quizzes.
-# POST /trigger_quiz with JSON: {"secret":"<QUIZ_SECRET>", "user_id": optional}
+# POST /trigger_quiz with JSON: {"secret":"<QUIZ_SECRET>", "user_id": optional,
+# "reset": optional, true drops unfinished quizzes first,
+# "force": optional, true sends to every user regardless of the daily quota}
+# Without user_id the quizzes go out in a background thread and the
+# request returns 202 right away, so the caller's timeout doesn't matter.
+def _send_quiz_to_all(user_ids: List[int], force: bool):
+    sent = 0
+    for uid in user_ids:
+        try:
+            if force:
+                send_quiz_to_user(uid)
+            else:
+                send_quiz_if_allowed(uid)
+            sent += 1
+        except Exception as e:
+            print(f"[ERROR] Failed to send quiz to {uid}: {e}")
+    print(f"Scheduled quiz run finished: {sent}/{len(user_ids)} users.")
+
 @app.route("/trigger_quiz", methods=["POST"])
 def trigger_quiz():
     if not QUIZ_SECRET:
@@ -509,6 +584,9 @@ def trigger_quiz():
     if data.get("secret") != QUIZ_SECRET:
         return jsonify({"error": "Unauthorized"}), 401
 
+    if data.get("reset"):
+        quiz_sessions.reset_all()
+
     target = data.get("user_id")
     if target:
         try:
@@ -518,18 +596,60 @@ def trigger_quiz():
         except Exception as e:
             return jsonify({"error": "invalid user_id"}), 400
 
-    # send to all users in tracking (respect daily quota)
-    tdata = load_tracking()
-    users = tdata.get("users", {})
-    sent = []
-    for sid, u in users.items():
+    # send to all users in tracking (respecting the daily quota unless forced)
+    user_ids = []
+    for sid in load_tracking().get("users", {}):
         try:
-            uid = int(sid)
-            send_quiz_if_allowed(uid)
-            sent.append(uid)
-        except Exception:
+            user_ids.append(int(sid))
+        except ValueError:
             continue
-    return jsonify({"status": "ok", "sent_count": len(sent)}), 200
+    force = bool(data.get("force"))
+    threading.Thread(target=_send_quiz_to_all, args=(user_ids, force),
+                     name="quiz-trigger", daemon=True).start()
+    return jsonify({"status": "accepted", "user_count": len(user_ids), "force": force}), 202
+
+# Admin statistics. Authenticate with the X-Admin-Secret header.
+def _admin_authorized() -> bool:
+    supplied = request.headers.get("X-Admin-Secret", "")
+    return bool(ADMIN_SECRET) and hmac.compare_digest(supplied.encode("utf-8"), ADMIN_SECRET.encode("utf-8"))
+
+@app.route("/admin/stats", methods=["GET"])
+def admin_stats():
+    if not ADMIN_SECRET:
+        return jsonify({"error": "ADMIN_SECRET not configured on server."}), 500
+    if not _admin_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify(analytics.summary()), 200
+
+# GET /admin/export/<users|words|daily>?format=ndjson|csv streams one row per line
+@app.route("/admin/export/<kind>", methods=["GET"])
+def admin_export(kind: str):
+    if not ADMIN_SECRET:
+        return jsonify({"error": "ADMIN_SECRET not configured on server."}), 500
+    if not _admin_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+    if kind not in EXPORTS:
+        return jsonify({"error": f"unknown export '{kind}'"}), 404
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(export_stats(analytics, kind, fmt), mimetype=mimetype)
+
+# GET shows profiler settings; POST {"sample_rate": 0.1, "slow_ms": 500} changes them
+@app.route("/admin/profiling", methods=["GET", "POST"])
+def admin_profiling():
+    if not ADMIN_SECRET:
+        return jsonify({"error": "ADMIN_SECRET not configured on server."}), 500
+    if not _admin_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+    if request.method == "POST":
+        data = request.get_json(force=True, silent=True) or {}
+        try:
+            profiler.configure(data.get("sample_rate"), data.get("slow_ms"), data.get("interval_ms"))
+        except (TypeError, ValueError):
+            return jsonify({"error": "sample_rate, slow_ms and interval_ms must be numbers"}), 400
+    return jsonify(profiler.settings()), 200
 
 def set_webhook():
     if not PUBLIC_URL:
@@ -549,5 +669,7 @@ def set_webhook():
 # ---------------- Start ----------------
 if __name__ == "__main__":
     set_webhook()
+    if VOCAB_SYNC_INTERVAL > 0:
+        vocabulary.start()
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port)
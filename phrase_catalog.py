@@ -0,0 +1,239 @@
+# phrase_catalog.py
+import os
+import json
+import hashlib
+import random
+import threading
+import time
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import format_phrase
+
+# Telegram rejects callback_data longer than 64 bytes.
+CALLBACK_DATA_LIMIT = 64
+TOPIC_CALLBACK_PREFIX = "phrase:"
+PAGE_CALLBACK_PREFIX = "phrase_page:"
+
+
+# ---------------- Weighted sampling ----------------
+class WeightedSampler:
+    """
+    Picks an index with probability proportional to its weight.
+    Cumulative weights are computed once, so each pick is one random()
+    call plus a binary search.
+    """
+    __slots__ = ("_cumulative", "_total")
+
+    def __init__(self, weights: List[float]):
+        self._cumulative = list(accumulate(weights))
+        self._total = self._cumulative[-1] if self._cumulative else 0.0
+
+    def __len__(self) -> int:
+        return len(self._cumulative)
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    def pick(self, rng: Any = random) -> int:
+        if self._total <= 0:
+            return rng.randrange(len(self._cumulative))
+        idx = bisect_right(self._cumulative, rng.random() * self._total)
+        return min(idx, len(self._cumulative) - 1)
+
+
+def _phrase_weight(item: Any) -> float:
+    # Entries may carry an optional positive "weight"; everything else counts as 1.
+    if isinstance(item, dict):
+        try:
+            weight = float(item.get("weight", 1))
+        except (TypeError, ValueError):
+            return 1.0
+        return weight if weight > 0 else 1.0
+    return 1.0
+
+
+def _phrase_label(item: Any) -> str:
+    # Short form used as a quiz option: the phrase itself, without its meaning.
+    if isinstance(item, dict) and "phrase" in item:
+        return str(item["phrase"])
+    return str(item)
+
+
+def _render_phrase(item: Any) -> str:
+    if isinstance(item, dict) and "phrase" in item and "meaning" in item:
+        return format_phrase(item)
+    return f"🌟 {item}"
+
+
+# ---------------- Snapshot ----------------
+class _CatalogSnapshot:
+    """
+    Immutable view of one version of phrases.json. A reload builds a new
+    snapshot and swaps it in, so readers never see a half-built catalog.
+    """
+    __slots__ = ("topics", "topic_index", "topic_tokens", "labels", "rendered",
+                 "phrase_samplers", "topic_sampler", "pages")
+
+    def __init__(self, data: Dict[str, List[Any]], page_size: int):
+        self.topics: List[str] = []
+        self.labels: List[List[str]] = []
+        self.rendered: List[List[str]] = []
+        self.phrase_samplers: List[WeightedSampler] = []
+        for topic, items in data.items():
+            if not isinstance(items, list) or not items:
+                continue
+            self.topics.append(topic)
+            self.labels.append([_phrase_label(item) for item in items])
+            self.rendered.append([_render_phrase(item) for item in items])
+            self.phrase_samplers.append(WeightedSampler([_phrase_weight(item) for item in items]))
+        self.topic_index = {topic: i for i, topic in enumerate(self.topics)}
+        self.topic_tokens = {_topic_token(topic): topic for topic in self.topics}
+        # Topics are weighted by their total phrase weight, so every phrase
+        # in the catalog is equally likely when sampling across topics.
+        self.topic_sampler = WeightedSampler([s.total for s in self.phrase_samplers])
+        self.pages = self._build_pages(page_size)
+
+    def _build_pages(self, page_size: int) -> List[str]:
+        page_count = max(1, -(-len(self.topics) // page_size))
+        pages = []
+        for page in range(page_count):
+            start = page * page_size
+            rows = [[{"text": topic, "callback_data": _topic_callback_data(topic)}]
+                    for topic in self.topics[start:start + page_size]]
+            nav = []
+            if page > 0:
+                nav.append({"text": "« Prev", "callback_data": f"{PAGE_CALLBACK_PREFIX}{page - 1}"})
+            if page < page_count - 1:
+                nav.append({"text": "Next »", "callback_data": f"{PAGE_CALLBACK_PREFIX}{page + 1}"})
+            if nav:
+                rows.append(nav)
+            pages.append(json.dumps({"inline_keyboard": rows}, ensure_ascii=False))
+        return pages
+
+
+def _topic_token(topic: str) -> str:
+    # Derived from the name only, so buttons on old keyboards keep pointing
+    # at the same topic after phrases.json is edited or reordered.
+    return "#" + hashlib.sha1(topic.encode("utf-8")).hexdigest()[:16]
+
+
+def _topic_callback_data(topic: str) -> str:
+    data = f"{TOPIC_CALLBACK_PREFIX}{topic}"
+    if len(data.encode("utf-8")) <= CALLBACK_DATA_LIMIT:
+        return data
+    # Long topic names are addressed by a hash of the name instead.
+    return f"{TOPIC_CALLBACK_PREFIX}{_topic_token(topic)}"
+
+
+# ---------------- Catalog ----------------
+class PhraseCatalog:
+    """
+    In-memory phrase topics loaded from phrases.json.
+
+    The file is parsed once and reloaded only when its mtime or size
+    changes; that check runs at most every `check_interval` seconds, so
+    serving a phrase normally touches no disk at all. Topic keyboards are
+    kept as pre-serialized JSON, which telebot passes through unchanged
+    as `reply_markup`.
+    """
+
+    def __init__(self, path: str, page_size: int = 8, check_interval: float = 5.0):
+        self.path = path
+        self.page_size = max(1, page_size)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._next_check = 0.0
+        self._snapshot = _CatalogSnapshot({}, self.page_size)
+
+    # ----- loading -----
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _current(self) -> _CatalogSnapshot:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self.refresh(now)
+        return self._snapshot
+
+    def refresh(self, now: Optional[float] = None, force: bool = False) -> bool:
+        """Reload the file if it changed since the last load. Returns True on reload."""
+        with self._lock:
+            self._next_check = (time.monotonic() if now is None else now) + self.check_interval
+            stamp = self._file_stamp()
+            if stamp == self._stamp and not force:
+                return False
+            data: Dict[str, List[Any]] = {}
+            if stamp is not None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        loaded = json.load(f)
+                    if isinstance(loaded, dict):
+                        data = loaded
+                except Exception as e:
+                    print(f"[ERROR] Failed to load phrases {self.path}: {e}")
+                    # keep serving the previous version until the file is fixed
+                    if self._snapshot.topics:
+                        return False
+            self._snapshot = _CatalogSnapshot(data, self.page_size)
+            self._stamp = stamp
+            return True
+
+    # ----- topics -----
+    def __bool__(self) -> bool:
+        return bool(self._current().topics)
+
+    def resolve_topic(self, token: str) -> Optional[str]:
+        """Map the part of a callback after 'phrase:' back to a topic name."""
+        snap = self._current()
+        if token in snap.topic_index:
+            return token
+        return snap.topic_tokens.get(token)
+
+    # ----- keyboards -----
+    def keyboard_page(self, page: int = 0) -> str:
+        """Pre-serialized InlineKeyboardMarkup JSON for one page of topics."""
+        pages = self._current().pages
+        return pages[min(max(page, 0), len(pages) - 1)]
+
+    # ----- sampling -----
+    def random_phrase_text(self, topic: str, rng: Any = random) -> Optional[str]:
+        """Formatted phrase text (see utils.format_phrase), rendered at load time."""
+        snap = self._current()
+        idx = snap.topic_index.get(topic)
+        if idx is None:
+            return None
+        return snap.rendered[idx][snap.phrase_samplers[idx].pick(rng)]
+
+    def quiz_phrase(self, distractors: int = 3, rng: Any = random) -> Optional[Tuple[str, str, List[str]]]:
+        """
+        (topic, phrase, other phrases) for a "which phrase belongs to this
+        topic" question. The phrase is drawn with the same weights as
+        random_phrase_text; distractors come from other topics and may be
+        fewer than asked for when the catalog is small.
+        """
+        snap = self._current()
+        if not snap.topics:
+            return None
+        idx = snap.topic_sampler.pick(rng)
+        phrase = snap.labels[idx][snap.phrase_samplers[idx].pick(rng)]
+        others: List[str] = []
+        if len(snap.topics) > 1:
+            # a bounded number of draws instead of listing every phrase
+            for _ in range(distractors * 4):
+                other = snap.topic_sampler.pick(rng)
+                if other == idx:
+                    continue
+                label = snap.labels[other][snap.phrase_samplers[other].pick(rng)]
+                if label != phrase and label not in others:
+                    others.append(label)
+                    if len(others) == distractors:
+                        break
+        return snap.topics[idx], phrase, others
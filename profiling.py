@@ -0,0 +1,207 @@
+# profiling.py
+import os
+import sys
+import json
+import time
+import random
+import logging
+import threading
+import functools
+from collections import Counter
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Dict, Optional
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapsed_stack(frame: Any) -> str:
+    """Root-first 'a;b;c' stack, the format flamegraph.pl and speedscope read."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class _ActiveRequest:
+    __slots__ = ("tag", "dispatch", "started", "sampled", "samples", "slow_stack")
+
+    def __init__(self, tag: str, sampled: bool, dispatch: bool = False):
+        self.tag = tag
+        self.dispatch = dispatch
+        self.started = time.perf_counter()
+        self.sampled = sampled
+        self.samples: Counter = Counter()
+        self.slow_stack: Optional[str] = None
+
+
+# ---------------- Profiler ----------------
+class RequestProfiler:
+    """
+    Sampling profiler for live bot handlers.
+
+    A single background thread wakes every `interval_ms` and reads the
+    current stack of each thread inside a profiled handler, so a handler
+    pays only for two dict operations unless it is sampled. A fraction
+    `sample_rate` of handler calls record every stack seen and are written
+    as collapsed-stack files (`<time>_<tag>.folded`), keeping the newest
+    `max_files`. Any call running longer than `slow_ms` gets one stack
+    snapshot logged to `slow_requests.log` whether sampled or not.
+
+    Handlers that only route to other handlers are decorated with
+    `dispatch=True`: the first profiled handler they call takes over the
+    tag, so work done on behalf of e.g. translate_word is reported under
+    that name rather than under the router's.
+    """
+
+    def __init__(self, out_dir: str, sample_rate: float = 0.0, slow_ms: float = 0.0,
+                 interval_ms: float = 5.0, max_files: int = 50):
+        self.out_dir = out_dir
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.interval_ms = interval_ms
+        self.max_files = max_files
+        self._active: Dict[int, _ActiveRequest] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._slow_log: Optional[logging.Logger] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_ms > 0
+
+    def configure(self, sample_rate: Optional[float] = None, slow_ms: Optional[float] = None,
+                  interval_ms: Optional[float] = None) -> Dict[str, float]:
+        """Change settings; raises TypeError/ValueError without applying anything if a value is bad."""
+        # convert everything first so a bad value leaves all settings untouched
+        new_rate = None if sample_rate is None else min(max(float(sample_rate), 0.0), 1.0)
+        new_slow = None if slow_ms is None else max(float(slow_ms), 0.0)
+        new_interval = None if interval_ms is None else max(float(interval_ms), 1.0)
+        if new_rate is not None:
+            self.sample_rate = new_rate
+        if new_slow is not None:
+            self.slow_ms = new_slow
+        if new_interval is not None:
+            self.interval_ms = new_interval
+        return self.settings()
+
+    def settings(self) -> Dict[str, float]:
+        return {"sample_rate": self.sample_rate, "slow_ms": self.slow_ms, "interval_ms": self.interval_ms}
+
+    # ----- handler hook -----
+    def profiled(self, tag: str, dispatch: bool = False) -> Callable:
+        """
+        Decorator that profiles a handler under `tag`. Nested calls inherit
+        the outer tag, unless the outer handler is a dispatcher that has not
+        handed off yet, in which case the nested tag replaces it.
+        """
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                ident = threading.get_ident()
+                outer = self._active.get(ident)
+                if outer is not None:
+                    if outer.dispatch:
+                        outer.tag, outer.dispatch = tag, dispatch
+                    return func(*args, **kwargs)
+                req = _ActiveRequest(tag, random.random() < self.sample_rate, dispatch)
+                with self._lock:
+                    self._active[ident] = req
+                self._ensure_thread()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    with self._lock:
+                        self._active.pop(ident, None)
+                    self._finish(req)
+            return wrapper
+        return decorator
+
+    # ----- sampler thread -----
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval_ms / 1000.0)
+            if not self._active:
+                # once profiling is switched off and nothing is in flight, stop
+                # waking up; the next profiled call starts a new thread
+                with self._lock:
+                    if not self.enabled and not self._active:
+                        self._thread = None
+                        return
+                continue
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            with self._lock:
+                for ident, req in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is None:
+                        continue
+                    if req.sampled:
+                        req.samples[_collapsed_stack(frame)] += 1
+                    if (self.slow_ms and req.slow_stack is None
+                            and (now - req.started) * 1000.0 >= self.slow_ms):
+                        req.slow_stack = _collapsed_stack(frame)
+            del frames
+
+    # ----- output -----
+    def _finish(self, req: _ActiveRequest):
+        duration_ms = (time.perf_counter() - req.started) * 1000.0
+        try:
+            if req.sampled and req.samples:
+                self._write_profile(req)
+            if req.slow_stack is not None:
+                self._log_slow(req, duration_ms)
+        except Exception as e:
+            print("[ERROR] Failed to write profile:", e)
+
+    def _write_profile(self, req: _ActiveRequest):
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = os.path.join(self.out_dir, f"{stamp}_{req.tag}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in req.samples.items():
+                f.write(f"{req.tag};{stack} {count}\n")
+        self._rotate()
+
+    def _rotate(self):
+        files = sorted(name for name in os.listdir(self.out_dir) if name.endswith(".folded"))
+        for name in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.out_dir, name))
+            except OSError:
+                pass
+
+    def _slow_logger(self) -> logging.Logger:
+        # handlers finish on several threads at once; set the logger up only once
+        with self._lock:
+            if self._slow_log is None:
+                logger = logging.getLogger("vocabulary_bot.slow_requests")
+                if not logger.handlers:
+                    os.makedirs(self.out_dir, exist_ok=True)
+                    logger.addHandler(RotatingFileHandler(
+                        os.path.join(self.out_dir, "slow_requests.log"),
+                        maxBytes=1_000_000, backupCount=3, encoding="utf-8"))
+                logger.propagate = False
+                logger.setLevel(logging.INFO)
+                self._slow_log = logger
+            return self._slow_log
+
+    def _log_slow(self, req: _ActiveRequest, duration_ms: float):
+        self._slow_logger().info(json.dumps({
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "handler": req.tag,
+            "duration_ms": round(duration_ms, 1),
+            "stack": req.slow_stack,
+        }, ensure_ascii=False))
@@ -0,0 +1,231 @@
+# quiz_sessions.py
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+
+# ---------------- Session ----------------
+class QuizSession:
+    """State of one user's running quiz."""
+    __slots__ = ("user_id", "questions", "index", "results", "poll_id", "started")
+
+    def __init__(self, user_id: str, questions: List[Dict[str, Any]], index: int = 0,
+                 results: Optional[List[Dict[str, Any]]] = None, poll_id: Optional[str] = None,
+                 started: Optional[float] = None):
+        self.user_id = user_id
+        self.questions = questions
+        self.index = index
+        self.results = results if results is not None else []
+        self.poll_id = poll_id
+        self.started = started if started is not None else time.time()
+
+    @property
+    def finished(self) -> bool:
+        return self.index >= len(self.questions)
+
+    @property
+    def current_question(self) -> Optional[Dict[str, Any]]:
+        return None if self.finished else self.questions[self.index]
+
+    @property
+    def correct_count(self) -> int:
+        return sum(1 for r in self.results if r.get("correct"))
+
+
+# ---------------- Store ----------------
+class QuizSessionStore:
+    """
+    In-memory quiz sessions keyed by user id and by active poll id.
+
+    Every change is also queued as one small journal record
+    ({"op": "start" | "poll" | "answer" | "end" | "restore", ...}). A
+    background thread appends queued records to `journal_path` in batches,
+    every `flush_interval` seconds or as soon as `batch_size` records are
+    waiting. On startup the journal is replayed and compacted to one
+    "restore" record per live session.
+    """
+
+    def __init__(self, journal_path: str, flush_interval: float = 1.0, batch_size: int = 64,
+                 compact_after: int = 5000):
+        self.journal_path = journal_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.compact_after = compact_after
+        self.by_user: Dict[str, QuizSession] = {}
+        self.by_poll: Dict[str, QuizSession] = {}
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pending: List[str] = []
+        self._journal_records = 0
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._replay()
+        self.compact()
+
+    # ----- journal -----
+    def _apply(self, rec: Dict[str, Any]) -> bool:
+        """Apply one record to the in-memory sessions; False if it no longer applies."""
+        op = rec.get("op")
+        sid = str(rec.get("user", ""))
+        session = self.by_user.get(sid)
+        if op in ("start", "restore"):
+            if session is not None and session.poll_id:
+                self.by_poll.pop(session.poll_id, None)
+            session = QuizSession(sid, rec.get("questions", []), rec.get("index", 0),
+                                  rec.get("results"), rec.get("poll"), rec.get("started"))
+            self.by_user[sid] = session
+            if session.poll_id:
+                self.by_poll[session.poll_id] = session
+        elif op == "answer":
+            # only the session that still owns the answered poll may advance;
+            # a quiz started in the meantime has already dropped that poll
+            poll = rec.get("poll")
+            session = self.by_poll.get(poll) if poll else session
+            if session is None or session.user_id != sid:
+                return False
+            session.results.append(rec.get("result", {}))
+            session.index += 1
+            self.by_poll.pop(session.poll_id, None)
+            session.poll_id = None
+        elif session is None:
+            return False
+        elif op == "poll":
+            if session.poll_id:
+                self.by_poll.pop(session.poll_id, None)
+            session.poll_id = rec.get("poll")
+            if session.poll_id:
+                self.by_poll[session.poll_id] = session
+        elif op == "end":
+            if session.poll_id:
+                self.by_poll.pop(session.poll_id, None)
+            self.by_user.pop(sid, None)
+        return True
+
+    def _replay(self):
+        if not os.path.exists(self.journal_path):
+            return
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        # a torn final line from a crash mid-append; everything before it is intact
+                        print(f"[ERROR] Skipping unreadable quiz journal line in {self.journal_path}")
+        except Exception as e:
+            print(f"[ERROR] Failed to replay quiz journal {self.journal_path}: {e}")
+
+    def _record(self, rec: Dict[str, Any]) -> bool:
+        # callers hold self._lock
+        if not self._apply(rec):
+            return False
+        self._pending.append(json.dumps(rec, ensure_ascii=False))
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+        self._ensure_thread()
+        return True
+
+    def flush(self):
+        """Append all queued records to the journal in one write."""
+        with self._io_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(batch) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal_records += len(batch)
+            except Exception as e:
+                print(f"[ERROR] Failed to append quiz journal {self.journal_path}: {e}")
+                with self._lock:
+                    self._pending = batch + self._pending
+                return
+        if self._journal_records > self.compact_after:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal as one 'restore' record per live session."""
+        with self._io_lock:
+            with self._lock:
+                # anything still pending is already reflected in the sessions
+                self._pending = []
+                lines = [json.dumps({
+                    "op": "restore", "user": s.user_id, "questions": s.questions, "index": s.index,
+                    "results": s.results, "poll": s.poll_id, "started": s.started
+                }, ensure_ascii=False) for s in self.by_user.values()]
+            tmp_path = self.journal_path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write("".join(line + "\n" for line in lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.journal_path)
+                self._journal_records = len(lines)
+            except Exception as e:
+                print(f"[ERROR] Failed to compact quiz journal {self.journal_path}: {e}")
+
+    # ----- background writer -----
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="quiz-journal", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    # ----- sessions -----
+    def start(self, user_id: Any, questions: List[Dict[str, Any]]) -> QuizSession:
+        """Begin a new quiz for the user, replacing any unfinished one."""
+        sid = str(user_id)
+        with self._lock:
+            self._record({"op": "start", "user": sid, "questions": questions, "started": time.time()})
+            return self.by_user[sid]
+
+    def get(self, user_id: Any) -> Optional[QuizSession]:
+        return self.by_user.get(str(user_id))
+
+    def for_poll(self, poll_id: str) -> Optional[QuizSession]:
+        return self.by_poll.get(poll_id)
+
+    def attach_poll(self, session: QuizSession, poll_id: str):
+        """Bind `poll_id` to the session; ignored if the session was replaced or reset meanwhile."""
+        with self._lock:
+            if self.by_user.get(session.user_id) is not session:
+                return
+            self._record({"op": "poll", "user": session.user_id, "poll": poll_id})
+
+    def answer(self, session: QuizSession, poll_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Store the result for the question asked by `poll_id` and advance.
+        Returns False if that poll no longer belongs to `session`.
+        """
+        with self._lock:
+            if self.by_poll.get(poll_id) is not session:
+                return False
+            return self._record({"op": "answer", "user": session.user_id, "poll": poll_id, "result": result})
+
+    def finish(self, user_id: Any):
+        sid = str(user_id)
+        with self._lock:
+            if sid in self.by_user:
+                self._record({"op": "end", "user": sid})
+
+    def reset_all(self):
+        """Drop every unfinished quiz."""
+        with self._lock:
+            for sid in list(self.by_user):
+                self._record({"op": "end", "user": sid})
+        self.flush()
@@ -1,39 +1,40 @@
 # send_quiz.py
-from bot import send_quiz_to_user, load_all_users, TRACK_FILE, load_json, save_json
+import os
 import logging
+import requests
+from dotenv import load_dotenv
 
 # ---------------- Logging ----------------
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
-def reset_unfinished_quizzes():
+# ---------------- Environment ----------------
+load_dotenv()
+PUBLIC_URL = os.getenv("PUBLIC_URL", "")
+QUIZ_SECRET = os.getenv("QUIZ_SECRET", "")
+
+def main():
     """
-    Resets current quizzes for users so daily or scheduled quizzes start fresh.
+    Ask the running bot to reset unfinished quizzes and send a new one to
+    every user. Quiz sessions live in the server's memory, so this goes
+    through /trigger_quiz instead of touching the bot's files from here.
+    The server sends the polls in the background and answers 202 at once.
     """
-    data = load_json(TRACK_FILE)
-    if not isinstance(data, dict):
+    if not PUBLIC_URL or not QUIZ_SECRET:
+        logging.error("❌ PUBLIC_URL and QUIZ_SECRET are required to trigger quizzes.")
         return
 
-    users = data.get("users", {})
-    for sid, info in users.items():
-        if "current_quiz" in info:
-            info.pop("current_quiz")  # Remove unfinished quiz
-    data["users"] = users
-    save_json(TRACK_FILE, data)
-    logging.info("✅ Reset all unfinished quizzes.")
-
-def main():
-    reset_unfinished_quizzes()  # Ensure fresh quizzes
-    users = load_all_users()    # Returns dict {user_id: {info}}
-    if not users:
-        logging.warning("No users found to send quizzes.")
+    url = f"{PUBLIC_URL.rstrip('/')}/trigger_quiz"
+    try:
+        r = requests.post(url, json={"secret": QUIZ_SECRET, "reset": True, "force": True},
+                          timeout=60)
+    except Exception as e:
+        logging.error(f"❌ Failed to reach {url}: {e}")
         return
 
-    for uid, info in users.items():
-        try:
-            send_quiz_to_user(int(uid))  # New multiple-choice quiz handles usage internally
-            logging.info(f"✅ Sent quiz to {info.get('username', uid)}")
-        except Exception as e:
-            logging.error(f"❌ Failed to send quiz to {info.get('username', uid)}: {e}")
+    if r.status_code not in (200, 202):
+        logging.error(f"❌ Trigger failed with HTTP {r.status_code}: {r.text}")
+        return
+    logging.info(f"✅ Reset unfinished quizzes; sending to {r.json().get('user_count', 0)} users.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quiz_sessions import QuizSessionStore
+
+QUESTIONS = [
+    {"type": "word_pos", "prompt": "What is the part of speech of *run*?",
+     "options": ["noun", "verb", "adjective", "adverb"], "correct_index": 1},
+    {"type": "word_translation", "prompt": "Translate this word: *happy*",
+     "options": ["baxtli", "yugurmoq", "katta", "kichik"], "correct_index": 0},
+]
+
+
+def _records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_replay_after_start_poll_answer_end(tmp_path):
+    journal = str(tmp_path / "quiz_sessions.journal")
+    store = QuizSessionStore(journal)
+    a = store.start(1, QUESTIONS)
+    store.attach_poll(a, "p1")
+    assert store.answer(a, "p1", {"correct": True}) is True
+    store.attach_poll(a, "p2")
+    store.start(2, QUESTIONS)
+    store.finish(2)
+    store.flush()
+
+    restarted = QuizSessionStore(journal)
+    session = restarted.get(1)
+    assert session.index == 1 and session.correct_count == 1
+    assert session.poll_id == "p2" and restarted.for_poll("p2") is session
+    assert restarted.for_poll("p1") is None
+    assert restarted.get(2) is None
+
+    # startup compacts the journal to one restore record per live session
+    assert [(r["op"], r["user"]) for r in _records(journal)] == [("restore", "1")]
+
+
+def test_compaction_after_threshold(tmp_path):
+    journal = str(tmp_path / "quiz_sessions.journal")
+    store = QuizSessionStore(journal, compact_after=5)
+    for user in range(4):
+        store.start(user, QUESTIONS)
+    store.finish(0)
+    store.finish(1)
+    store.flush()
+    ops = [r["op"] for r in _records(journal)]
+    assert ops == ["restore", "restore"]
+    assert sorted(QuizSessionStore(journal).by_user) == ["2", "3"]
+
+
+def test_torn_final_line_is_skipped(tmp_path, capsys):
+    journal = str(tmp_path / "quiz_sessions.journal")
+    store = QuizSessionStore(journal)
+    store.attach_poll(store.start(1, QUESTIONS), "p1")
+    store.flush()
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"op": "answer", "user": "1", "po')
+
+    restarted = QuizSessionStore(journal)
+    assert "unreadable quiz journal line" in capsys.readouterr().out
+    assert restarted.get(1).index == 0 and restarted.for_poll("p1") is not None
+    assert [r["op"] for r in _records(journal)] == ["restore"]
+
+
+def test_stale_answer_is_ignored_live_and_on_replay(tmp_path):
+    journal = str(tmp_path / "quiz_sessions.journal")
+    store = QuizSessionStore(journal)
+    old = store.start(1, QUESTIONS)
+    store.attach_poll(old, "p1")
+    new = store.start(1, QUESTIONS)
+
+    # an answer to the replaced quiz's poll must not advance the new quiz
+    assert store.answer(old, "p1", {"correct": True}) is False
+    assert new.index == 0 and store.for_poll("p1") is None
+
+    # same ordering written straight into the journal, as after a crash
+    store.flush()
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"op": "answer", "user": "1", "poll": "p1", "result": {"correct": True}}) + "\n")
+    assert QuizSessionStore(journal).get(1).index == 0
+
+
+def test_stale_attach_poll_is_ignored(tmp_path):
+    journal = str(tmp_path / "quiz_sessions.journal")
+    store = QuizSessionStore(journal)
+    old = store.start(1, QUESTIONS)
+    new = store.start(1, QUESTIONS)
+    store.attach_poll(old, "p1")
+    assert new.poll_id is None and store.for_poll("p1") is None
+
+    store.reset_all()
+    store.attach_poll(new, "p2")
+    assert store.get(1) is None and store.for_poll("p2") is None
@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import threading
+import functools
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vocab_sync import VocabularySync, build_delta, content_hash
+
+WORDS = {
+    "happy": {"translation": "baxtli", "part_of_speech": "adjective"},
+    "run": {"translation": "yugurmoq", "part_of_speech": "verb"},
+}
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    requested = None  # set per server: list of request paths
+
+    def do_GET(self):
+        self.requested.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serve tmp_path/srv over HTTP on a free port; yields (srv_dir, base_url, requested_paths)."""
+    srv = tmp_path / "srv"
+    srv.mkdir()
+    (srv / "words.json").write_text(json.dumps(WORDS), encoding="utf-8")
+    requested = []
+    handler_cls = type("_Handler", (_QuietHandler,), {"requested": requested})
+    handler = functools.partial(handler_cls, directory=str(srv))
+    httpd = HTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield srv, f"http://127.0.0.1:{httpd.server_port}", requested
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_full_fetch_then_not_modified(server, tmp_path):
+    srv, url, _ = server
+    local = tmp_path / "data" / "words.json"
+    mirror = tmp_path / "words.json"
+    updates = []
+    sync = VocabularySync(f"{url}/words.json", str(local), mirror_paths=[str(mirror)],
+                          on_update=updates.append)
+    assert sync.words == {}
+
+    # 200: the snapshot is applied, written to both files and announced
+    assert sync.refresh() is True
+    assert sync.words == WORDS
+    assert sync.lookup("HAPPY") == WORDS["happy"]
+    assert json.loads(local.read_text(encoding="utf-8")) == WORDS
+    assert json.loads(mirror.read_text(encoding="utf-8")) == WORDS
+    assert updates == [WORDS]
+
+    # 304: the validators saved next to the file are used after a restart
+    meta = json.loads((tmp_path / "data" / "words.meta.json").read_text(encoding="utf-8"))
+    assert meta["hash"] == content_hash(WORDS) and meta["last_modified"]
+    restarted = VocabularySync(f"{url}/words.json", str(local))
+    assert restarted.refresh() is False
+    assert restarted.words == WORDS
+
+    # 200 with identical content: nothing is applied, but the new validators are saved
+    words_file = srv / "words.json"
+    later = os.stat(words_file).st_mtime + 10
+    os.utime(words_file, (later, later))
+    assert restarted.refresh() is False
+    new_meta = json.loads((tmp_path / "data" / "words.meta.json").read_text(encoding="utf-8"))
+    assert new_meta["last_modified"] != meta["last_modified"]
+
+
+def test_delta_applied_and_hash_mismatch_falls_back(server, tmp_path):
+    srv, url, _ = server
+    local = tmp_path / "words.json"
+    sync = VocabularySync(f"{url}/words.json", str(local))
+    assert sync.refresh() is True
+
+    new = dict(WORDS)
+    new["zebra"] = {"translation": "zebra"}
+    del new["run"]
+    (srv / "delta.json").write_text(json.dumps(build_delta(WORDS, new)), encoding="utf-8")
+    sync.delta_url = f"{url}/delta.json"
+    assert sync.refresh() is True
+    assert sync.words == new
+    assert json.loads(local.read_text(encoding="utf-8")) == new
+
+    # a delta that does not produce its advertised hash is ignored and the
+    # full file is downloaded instead
+    final = {**new, "cat": {"translation": "mushuk"}}
+    words_file = srv / "words.json"
+    words_file.write_text(json.dumps(final), encoding="utf-8")
+    later = os.stat(words_file).st_mtime + 10
+    os.utime(words_file, (later, later))
+    bad = build_delta(new, final)
+    bad["hash"] = "0" * 64
+    (srv / "delta.json").write_text(json.dumps(bad), encoding="utf-8")
+    assert sync.refresh() is True
+    assert sync.words == final
+
+
+def test_empty_delta_skips_full_download_and_malformed_delta_falls_back(server, tmp_path):
+    srv, url, requested = server
+    sync = VocabularySync(f"{url}/words.json", str(tmp_path / "words.json"),
+                          delta_url=f"{url}/delta.json")
+    assert sync.refresh() is True
+
+    # an empty delta against the current hash means "up to date"
+    h = content_hash(WORDS)
+    (srv / "delta.json").write_text(json.dumps({"base": h, "hash": h}), encoding="utf-8")
+    requested.clear()
+    assert sync.refresh() is False
+    assert [p.split("?")[0] for p in requested] == ["/delta.json"]
+
+    # a delta with the wrong shape is rejected instead of aborting the poll
+    (srv / "delta.json").write_text(json.dumps({"base": h, "hash": h, "set": ["zebra"]}), encoding="utf-8")
+    requested.clear()
+    assert sync.refresh() is False
+    assert [p.split("?")[0] for p in requested] == ["/delta.json", "/words.json"]
+    assert sync.words == WORDS
+
+
+def test_invalid_json_source_keeps_snapshot(server, tmp_path, capsys):
+    srv, url, _ = server
+    local = tmp_path / "words.json"
+    sync = VocabularySync(f"{url}/words.json", str(local))
+    assert sync.refresh() is True
+    capsys.readouterr()
+
+    # two objects back to back, like the old root words.json
+    words_file = srv / "words.json"
+    words_file.write_text(json.dumps(WORDS) + ",\n" + json.dumps(WORDS), encoding="utf-8")
+    later = os.stat(words_file).st_mtime + 10
+    os.utime(words_file, (later, later))
+    assert sync.refresh() is False
+    assert sync.words == WORDS
+    assert json.loads(local.read_text(encoding="utf-8")) == WORDS
+    out = capsys.readouterr().out.strip().splitlines()
+    assert len(out) == 1 and "is not valid JSON" in out[0]
+
+
+def test_repo_corpus_is_valid_and_in_sync():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, "words.json"), encoding="utf-8") as f:
+        top = json.load(f)
+    with open(os.path.join(root, "data", "words.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    assert top == data and isinstance(data, dict) and data
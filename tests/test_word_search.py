@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from word_search import WordIndex, _IndexSnapshot, normalize
+
+WORDS = {
+    "travel": {"translation": "sayohat qilmoq", "part_of_speech": "verb"},
+    "trip": {"translation": "sayohat", "part_of_speech": "noun"},
+    "tree": {"translation": "daraxt", "part_of_speech": "noun"},
+    "sad": {"translation": "xafa", "part_of_speech": "adjective"},
+    "son": {"translation": "o‘g‘il", "part_of_speech": "noun"},
+    "trade": {"translation": "savdo", "part_of_speech": "noun"},
+    "say": {"translation": "aytmoq", "part_of_speech": "verb"},
+}
+
+
+def test_prefix_range_covers_exactly_the_matching_keys():
+    snap = _IndexSnapshot(WORDS, None)
+    lo, hi = snap.prefix_range("tr")
+    assert sorted(snap.keys[lo:hi]) == ["trade", "travel", "tree", "trip"]
+    assert all(not k.startswith("tr") for k in snap.keys[:lo] + snap.keys[hi:])
+    lo, hi = snap.prefix_range("zz")
+    assert lo == hi
+
+
+def test_ranking_exact_then_english_then_shorter():
+    index = WordIndex()
+    index.rebuild(WORDS)
+    # exact match first, then shorter keys
+    assert index.search("tr") == ["tree", "trip", "trade", "travel"]
+    assert index.search("trip")[0] == "trip"
+    # "say" is an English headword; "sayohat" only an Uzbek translation
+    assert index.search("say") == ["say", "trip", "travel"]
+    # later words of a multi-word translation are searchable too
+    assert index.search("qilmoq") == ["travel"]
+    assert index.search("sa", limit=2) == ["sad", "say"]
+
+
+def test_apostrophe_variants_match():
+    assert normalize("O‘g‘il") == normalize("oʻgʻil") == normalize("o'g'il") == "o'g'il"
+    index = WordIndex()
+    index.rebuild(WORDS)
+    for query in ("o'g'il", "o‘g‘", "oʻg", "O`G"):
+        assert index.search(query) == ["son"]
+
+
+def test_lru_cache_hits_and_evicts():
+    index = WordIndex(cache_size=2)
+    index.rebuild(WORDS)
+    ranked = []
+    rank = index._rank
+    index._rank = lambda snap, prefix: ranked.append(prefix) or rank(snap, prefix)
+
+    index.search("tr")
+    index.search("sa")
+    index.search("TR")  # normalizes to a cached prefix
+    assert ranked == ["tr", "sa"]
+
+    index.search("da")  # evicts "sa", the least recently used
+    assert list(index._snapshot.cache) == ["tr", "da"]
+    index.search("sa")
+    assert ranked == ["tr", "sa", "da", "sa"]
+
+    # a rebuild starts with an empty cache
+    index.rebuild(WORDS)
+    index.search("tr")
+    assert ranked[-1] == "tr"
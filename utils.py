@@ -37,6 +37,16 @@ def pick_random_phrase(phrases_list):
     if not phrases_list:
         return "❗ No phrases available."
     item = random.choice(phrases_list)
+    return format_phrase(item)
+
+
+# -----------------------------
+# Format a single phrase entry
+# -----------------------------
+def format_phrase(item):
+    """
+    Returns the display text for one {'phrase', 'meaning'} dictionary.
+    """
     return f"🌟 {item['phrase']} – {item['meaning']}"
 
 
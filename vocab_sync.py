@@ -0,0 +1,250 @@
+# vocab_sync.py
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+
+def content_hash(words: Dict[str, Any]) -> str:
+    """sha256 of the canonical JSON form, so full files and patched results compare equal."""
+    canonical = json.dumps(words, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def build_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Delta document turning `old` into `new`, in the format `apply_delta` reads:
+    {"base": <hash of old>, "hash": <hash of new>, "set": {word: info}, "delete": [word]}
+    """
+    return {
+        "base": content_hash(old),
+        "hash": content_hash(new),
+        "set": {k: v for k, v in new.items() if old.get(k) != v},
+        "delete": [k for k in old if k not in new],
+    }
+
+
+def apply_delta(words: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a new dict with the delta applied; `words` itself is left untouched."""
+    result = dict(words)
+    for key in delta.get("delete", []):
+        result.pop(key, None)
+    result.update(delta.get("set", {}))
+    return result
+
+
+# ---------------- Snapshot ----------------
+class VocabularySnapshot:
+    """One version of the vocabulary, swapped in as a whole."""
+    __slots__ = ("words", "by_lower", "hash", "etag", "last_modified", "loaded_at")
+
+    def __init__(self, words: Dict[str, Any], etag: str = "", last_modified: str = ""):
+        self.words = words
+        self.by_lower = {k.lower(): v for k, v in words.items()}
+        self.hash = content_hash(words)
+        self.etag = etag
+        self.last_modified = last_modified
+        self.loaded_at = time.time()
+
+
+# ---------------- Sync ----------------
+class VocabularySync:
+    """
+    Keeps words.json current without blocking request handlers.
+
+    Handlers read `words` / `lookup()` from the in-memory snapshot only.
+    A daemon thread polls `source_url` every `interval` seconds with
+    If-None-Match / If-Modified-Since. A new snapshot is verified by hash,
+    written to `local_path` (and every path in `mirror_paths`) via temp
+    file + rename, then swapped in and passed to `on_update`.
+
+    When `delta_url` is set it is asked first, as GET `delta_url?since=<hash>`.
+    The endpoint must answer with a delta (see `build_delta`) against that
+    hash, or with 304 / an empty delta ({"base": h, "hash": h}) when the
+    vocabulary is unchanged; both count as up to date and skip the full
+    download. Any other answer falls back to the full file, so a delta
+    endpoint that stays silent costs one full download per poll.
+    """
+
+    def __init__(self, source_url: str, local_path: str, mirror_paths: Optional[List[str]] = None,
+                 delta_url: str = "", interval: float = 600.0, timeout: float = 8.0,
+                 on_update: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.source_url = source_url
+        self.local_path = local_path
+        self.mirror_paths = [p for p in (mirror_paths or []) if p != local_path]
+        self.meta_path = os.path.splitext(local_path)[0] + ".meta.json"
+        self.delta_url = delta_url
+        self.interval = interval
+        self.timeout = timeout
+        self.on_update = on_update
+        self._fetch_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot = self._load_local()
+
+    # ----- reading -----
+    @property
+    def words(self) -> Dict[str, Any]:
+        return self._snapshot.words
+
+    @property
+    def version(self) -> str:
+        return self._snapshot.hash
+
+    def lookup(self, word: str) -> Optional[dict]:
+        """Case-insensitive headword lookup."""
+        return self._snapshot.by_lower.get(word.lower())
+
+    # ----- local files -----
+    def _load_local(self) -> VocabularySnapshot:
+        words: Dict[str, Any] = {}
+        meta: Dict[str, Any] = {}
+        try:
+            if os.path.exists(self.local_path):
+                with open(self.local_path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                if isinstance(loaded, dict):
+                    words = loaded
+            if os.path.exists(self.meta_path):
+                with open(self.meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+        except Exception as e:
+            print(f"[ERROR] Failed to load vocabulary {self.local_path}: {e}")
+        snap = VocabularySnapshot(words)
+        # HTTP validators only describe the local file if its content still matches
+        if meta.get("hash") == snap.hash:
+            snap.etag = meta.get("etag", "")
+            snap.last_modified = meta.get("last_modified", "")
+        return snap
+
+    @staticmethod
+    def _atomic_write(path: str, payload: str):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def _persist(self, snap: VocabularySnapshot):
+        payload = json.dumps(snap.words, ensure_ascii=False, indent=2)
+        for path in [self.local_path] + self.mirror_paths:
+            try:
+                self._atomic_write(path, payload)
+            except Exception as e:
+                print(f"[ERROR] Failed to write vocabulary {path}: {e}")
+        self._persist_meta(snap)
+
+    def _persist_meta(self, snap: VocabularySnapshot):
+        meta = {"hash": snap.hash, "etag": snap.etag, "last_modified": snap.last_modified}
+        try:
+            self._atomic_write(self.meta_path, json.dumps(meta))
+        except Exception as e:
+            print(f"[ERROR] Failed to write vocabulary meta {self.meta_path}: {e}")
+
+    # ----- fetching -----
+    def _fetch_delta(self, current: VocabularySnapshot) -> Optional[VocabularySnapshot]:
+        if not self.delta_url or not current.words:
+            return None
+        try:
+            r = requests.get(self.delta_url, params={"since": current.hash}, timeout=self.timeout)
+            if r.status_code not in (200, 304):
+                return None
+            delta = r.json() if r.status_code == 200 else None
+        except Exception as e:
+            print("Vocabulary delta fetch failed:", e)
+            return None
+        if r.status_code == 304:
+            return current
+        if not isinstance(delta, dict) or delta.get("base") != current.hash:
+            return None
+        changes, removed = delta.get("set", {}), delta.get("delete", [])
+        if (not isinstance(changes, dict) or not isinstance(removed, list)
+                or not all(isinstance(k, str) for k in removed)):
+            print("Vocabulary delta is malformed; falling back to full fetch.")
+            return None
+        if not changes and not removed and delta.get("hash") == current.hash:
+            return current
+        words = apply_delta(current.words, delta)
+        # full-file validators stay as they were: they still describe the
+        # last full download, and the delta endpoint is asked first anyway
+        snap = VocabularySnapshot(words, current.etag, current.last_modified)
+        if snap.hash != delta.get("hash"):
+            print("Vocabulary delta did not produce the advertised hash; falling back to full fetch.")
+            return None
+        return snap
+
+    def _fetch_full(self, current: VocabularySnapshot) -> Optional[VocabularySnapshot]:
+        headers = {}
+        if current.words:
+            if current.etag:
+                headers["If-None-Match"] = current.etag
+            if current.last_modified:
+                headers["If-Modified-Since"] = current.last_modified
+        r = requests.get(self.source_url, headers=headers, timeout=self.timeout)
+        if r.status_code == 304:
+            return None
+        if r.status_code != 200:
+            print(f"Vocabulary fetch returned HTTP {r.status_code}")
+            return None
+        try:
+            words = r.json()
+        except ValueError as e:
+            print(f"Vocabulary source {self.source_url} is not valid JSON ({e}); keeping current snapshot.")
+            return None
+        if not isinstance(words, dict) or not words:
+            print("Vocabulary fetch returned no words; keeping current snapshot.")
+            return None
+        return VocabularySnapshot(words, r.headers.get("ETag", ""), r.headers.get("Last-Modified", ""))
+
+    def refresh(self) -> bool:
+        """Fetch once and apply any new snapshot. Returns True if the vocabulary changed."""
+        with self._fetch_lock:
+            current = self._snapshot
+            try:
+                snap = self._fetch_delta(current)
+                if snap is current:
+                    # the delta endpoint reports no change
+                    return False
+                if snap is None:
+                    snap = self._fetch_full(current)
+            except Exception as e:
+                print("Failed to refresh vocabulary:", e)
+                return False
+            if snap is None:
+                return False
+            if snap.hash == current.hash:
+                # same content, possibly new validators; keep them for the next
+                # poll and across restarts
+                if (snap.etag, snap.last_modified) != (current.etag, current.last_modified):
+                    current.etag, current.last_modified = snap.etag, snap.last_modified
+                    self._persist_meta(current)
+                return False
+            self._persist(snap)
+            self._snapshot = snap
+        if self.on_update:
+            try:
+                self.on_update(snap.words)
+            except Exception as e:
+                print("Vocabulary update callback failed:", e)
+        return True
+
+    # ----- background thread -----
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vocabulary-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
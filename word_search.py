@@ -0,0 +1,129 @@
+# word_search.py
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Inline results Telegram will accept per answer.
+MAX_INLINE_RESULTS = 50
+
+# Source ranks: English headwords sort ahead of Uzbek translations.
+SOURCE_WORD = 0
+SOURCE_TRANSLATION = 1
+SOURCE_TRANSLATION_TOKEN = 2
+
+_TOKEN_PUNCTUATION = ".,;:!?/()[]\"-"
+_APOSTROPHES = str.maketrans({"‘": "'", "’": "'", "ʻ": "'", "ʼ": "'", "`": "'"})
+
+
+def normalize(text: str) -> str:
+    """Case-fold and unify the apostrophe variants used in Uzbek Latin (o‘, oʻ, o')."""
+    return " ".join(text.translate(_APOSTROPHES).casefold().split())
+
+
+# ---------------- Index snapshot ----------------
+class _IndexSnapshot:
+    """
+    Sorted array of (normalized key, source rank, entry id). A prefix maps
+    to one contiguous slice found with two binary searches.
+    """
+    __slots__ = ("keys", "sources", "entry_ids", "words", "payloads", "cache", "cache_lock")
+
+    def __init__(self, words: Dict[str, Any], render: Optional[Callable[[int, str, dict], Any]]):
+        self.words: List[str] = []
+        self.payloads: List[Any] = []
+        rows: List[Tuple[str, int, int]] = []
+        for word, info in words.items():
+            if not isinstance(info, dict):
+                info = {}
+            entry_id = len(self.words)
+            self.words.append(word)
+            self.payloads.append(render(entry_id, word, info) if render else word)
+            key = normalize(word)
+            if key:
+                rows.append((key, SOURCE_WORD, entry_id))
+            translation = normalize(str(info.get("translation") or ""))
+            if translation:
+                rows.append((translation, SOURCE_TRANSLATION, entry_id))
+                # later words of a multi-word translation ("sayohat qilmoq")
+                for token in translation.split()[1:]:
+                    token = token.strip(_TOKEN_PUNCTUATION)
+                    if token:
+                        rows.append((token, SOURCE_TRANSLATION_TOKEN, entry_id))
+        rows.sort()
+        self.keys = [r[0] for r in rows]
+        self.sources = [r[1] for r in rows]
+        self.entry_ids = [r[2] for r in rows]
+        self.cache: "OrderedDict[str, List[int]]" = OrderedDict()
+        self.cache_lock = threading.Lock()
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        # "\U0010ffff" sorts after every character a key can continue with
+        hi = bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+
+# ---------------- Search ----------------
+class WordIndex:
+    """
+    In-memory prefix index over words.json headwords and their Uzbek
+    translations, used for inline queries.
+
+    `search()` never touches disk or the network: the index is rebuilt
+    only through `rebuild()`, ranking stops once `budget_ms` is spent,
+    and results for recent queries are kept in a small LRU cache.
+    """
+
+    def __init__(self, render: Optional[Callable[[int, str, dict], Any]] = None,
+                 cache_size: int = 512, budget_ms: float = 20.0):
+        self.render = render
+        self.cache_size = cache_size
+        self.budget_ms = budget_ms
+        self._snapshot = _IndexSnapshot({}, None)
+
+    def rebuild(self, words: Dict[str, Any]):
+        """Index a new words dict; the swap is atomic for concurrent readers."""
+        self._snapshot = _IndexSnapshot(words if isinstance(words, dict) else {}, self.render)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.words)
+
+    def search(self, query: str, limit: int = MAX_INLINE_RESULTS) -> List[Any]:
+        """Return rendered payloads for the best matches of `query`, best first."""
+        snap = self._snapshot
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        limit = min(limit, MAX_INLINE_RESULTS)
+
+        with snap.cache_lock:
+            ids = snap.cache.get(prefix)
+            if ids is not None:
+                snap.cache.move_to_end(prefix)
+        if ids is None:
+            ids = self._rank(snap, prefix)
+            with snap.cache_lock:
+                snap.cache[prefix] = ids
+                if len(snap.cache) > self.cache_size:
+                    snap.cache.popitem(last=False)
+        return [snap.payloads[i] for i in ids[:limit]]
+
+    def _rank(self, snap: _IndexSnapshot, prefix: str) -> List[int]:
+        lo, hi = snap.prefix_range(prefix)
+        deadline = time.perf_counter() + self.budget_ms / 1000.0
+        best: Dict[int, Tuple[int, int, int, str]] = {}
+        for pos in range(lo, hi):
+            # check the clock every 256 rows; short prefixes can match the whole corpus
+            if not (pos - lo) & 0xFF and pos != lo and time.perf_counter() > deadline:
+                break
+            key = snap.keys[pos]
+            entry_id = snap.entry_ids[pos]
+            score = (0 if key == prefix else 1, snap.sources[pos], len(key), key)
+            prev = best.get(entry_id)
+            if prev is None or score < prev:
+                best[entry_id] = score
+        top = heapq.nsmallest(MAX_INLINE_RESULTS, best.items(), key=lambda kv: kv[1])
+        return [entry_id for entry_id, _ in top]